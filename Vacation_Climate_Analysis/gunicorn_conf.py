@@ -0,0 +1,8 @@
+# Gunicorn configuration for serving the climate app (run from this folder with 'gunicorn -c gunicorn_conf.py app:app')
+# A single worker process is used with multiple threads so that every thread shares the same engine and connection pool
+# defined in 'app.py'. The sqlite database is only read from, so the threads can all query it at the same time. 'threads'
+# should match the engine's 'pool_size'.
+bind = "127.0.0.1:5000"
+workers = 1
+threads = 8
+worker_class = "gthread"